@@ -0,0 +1,199 @@
+"""API JSON lokal untuk KPI dan seri tahunan yang sama dengan dashboard.
+
+Jalankan dari root repo:
+
+    python api_server.py --port 8502
+
+Endpoint (GET):
+
+    /v1/areas?scope=country
+    /v1/kpi?scope=country&name=Indonesia&threshold=30&start=2001&end=2024
+    /v1/series?scope=subnational&name=Indonesia%20-%20Aceh&metric=emissions&start=2010&end=2020
+"""
+import argparse
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from streamlit.logger import set_log_level
+
+from utils.query_index import METRICS, area_names, available_years, build_query_index, query_kpi, query_series
+
+SCOPES = ("country", "subnational", "global")
+DEFAULT_THRESHOLD = 30
+DEFAULT_START_YEAR = 2001
+DEFAULT_END_YEAR = 2024
+RESPONSE_CACHE_SIZE = 4096
+
+logger = logging.getLogger("api_server")
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_param(query, name, default):
+    value = query.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(400, f"Parameter '{name}' harus berupa bilangan bulat")
+
+
+def parse_query(path, query):
+    """Normalisasi parameter agar query yang setara memakai entri cache yang sama."""
+    scope = query.get("scope", "country")
+    if scope not in SCOPES:
+        raise QueryError(400, f"scope harus salah satu dari {', '.join(SCOPES)}")
+    if path == "/v1/areas":
+        return (scope,)
+
+    name = "global" if scope == "global" else query.get("name")
+    if not name:
+        raise QueryError(400, "Parameter 'name' wajib diisi")
+    threshold = _int_param(query, "threshold", DEFAULT_THRESHOLD)
+    start_year = _int_param(query, "start", DEFAULT_START_YEAR)
+    end_year = _int_param(query, "end", DEFAULT_END_YEAR)
+    if start_year > end_year:
+        raise QueryError(400, "Parameter 'start' tidak boleh lebih besar dari 'end'")
+
+    if path == "/v1/kpi":
+        return (scope, name, threshold, start_year, end_year)
+
+    metric = query.get("metric", "tree_loss")
+    if metric not in METRICS:
+        raise QueryError(400, f"metric harus salah satu dari {', '.join(METRICS)}")
+    return (scope, name, threshold, metric, start_year, end_year)
+
+
+class QueryService:
+    def __init__(self, index, cache_size=RESPONSE_CACHE_SIZE):
+        self.index = index
+        # Cache respons per query ternormalisasi; indeks baca-saja jadi aman dibagi antar thread
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def _check_years(self, start_year, end_year):
+        # Rentang di luar data akan terlihat seperti nol, bukan kesalahan
+        first_year, last_year = available_years(self.index)
+        if start_year < first_year or end_year > last_year:
+            raise QueryError(400, f"Rentang tahun harus di antara {first_year} dan {last_year}")
+
+    def _render(self, path, params):
+        if path == "/v1/areas":
+            (scope,) = params
+            payload = {"scope": scope, "areas": area_names(self.index, scope)}
+        elif path == "/v1/kpi":
+            scope, name, threshold, start_year, end_year = params
+            self._check_years(start_year, end_year)
+            kpi = query_kpi(self.index, scope, name, threshold, start_year, end_year)
+            if kpi is None:
+                raise QueryError(404, f"Data untuk '{name}' (threshold {threshold}) tidak ditemukan")
+            payload = {
+                "scope": scope, "name": name, "threshold": threshold,
+                "start": start_year, "end": end_year, "kpi": kpi,
+            }
+        else:
+            scope, name, threshold, metric, start_year, end_year = params
+            self._check_years(start_year, end_year)
+            series = query_series(self.index, scope, name, threshold, metric, start_year, end_year)
+            if series is None:
+                raise QueryError(404, f"Data '{metric}' untuk '{name}' (threshold {threshold}) tidak ditemukan")
+            payload = {
+                "scope": scope, "name": name, "threshold": threshold, "metric": metric,
+                "start": start_year, "end": end_year, **series,
+            }
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        return body, etag
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header dan body ditulis terpisah; tanpa ini keep-alive tertahan delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    routes = ("/v1/areas", "/v1/kpi", "/v1/series")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send_json(200, b'{"status": "ok"}')
+            return
+        if url.path not in self.routes:
+            self._send_error(404, f"Endpoint '{url.path}' tidak dikenal")
+            return
+
+        try:
+            params = parse_query(url.path, dict(parse_qsl(url.query)))
+            body, etag = self.server.service.render(url.path, params)
+        except QueryError as exc:
+            self._send_error(exc.status, exc.message)
+            return
+
+        if_none_match = self._if_none_match()
+        if "*" in if_none_match or etag in if_none_match:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_json(200, body, etag)
+
+    def _if_none_match(self):
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+    def _send_error(self, status, message):
+        self._send_json(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"))
+
+    def _send_json(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host="127.0.0.1", port=8502, index=None):
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.service = QueryService(build_query_index() if index is None else index)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON lokal untuk data deforestasi & emisi karbon")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Loader memakai st.cache_data; di luar `streamlit run` peringatan bare mode tidak relevan
+    set_log_level("error")
+    server = create_server(args.host, args.port)
+    logger.info("API berjalan di http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
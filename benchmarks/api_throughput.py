@@ -0,0 +1,122 @@
+"""Ukur throughput API lokal (api_server.py) dengan klien paralel.
+
+Secara default server dijalankan di proses ini pada port acak; gunakan --url
+untuk mengukur instance yang sudah berjalan:
+
+    python benchmarks/api_throughput.py --requests 2000 --concurrency 8
+    python benchmarks/api_throughput.py --url http://127.0.0.1:8502
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _get(conn, path, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, response.getheader("ETag"), body
+
+
+def _query_paths(host, port, limit):
+    conn = http.client.HTTPConnection(host, port)
+    _, _, body = _get(conn, "/v1/areas?scope=country")
+    countries = json.loads(body)["areas"][:limit]
+    paths = []
+    for name in countries:
+        for start, end in [(2001, 2024), (2010, 2020), (2015, 2024)]:
+            paths.append(f"/v1/kpi?scope=country&name={quote(name)}&start={start}&end={end}")
+            paths.append(f"/v1/series?scope=country&name={quote(name)}&metric=emissions&start={start}&end={end}")
+        paths.append(f"/v1/kpi?scope=global&start=2001&end={2001 + len(paths) % 24}")
+    conn.close()
+    return paths
+
+
+def run_load(host, port, paths, total, concurrency, conditional):
+    local = threading.local()
+    etags = {}
+    if conditional:
+        conn = http.client.HTTPConnection(host, port)
+        for path in paths:
+            etags[path] = _get(conn, path)[1]
+        conn.close()
+
+    def worker(i):
+        # Satu koneksi keep-alive per thread klien
+        if not hasattr(local, "conn"):
+            local.conn = http.client.HTTPConnection(host, port)
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        status, _, _ = _get(local.conn, path, etags.get(path))
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        "req_s": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="URL instance yang sudah berjalan, mis. http://127.0.0.1:8502")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--countries", type=int, default=20)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        from streamlit.logger import set_log_level
+
+        from api_server import create_server
+
+        # Sama seperti api_server.main(): sembunyikan peringatan bare mode st.cache_data
+        set_log_level("error")
+        server = create_server(port=0)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    paths = _query_paths(host, port, args.countries)
+    print(f"{len(paths)} query unik, {args.requests} request, {args.concurrency} klien paralel")
+    print(f"{'skenario':<22}{'req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}  status")
+    scenarios = [
+        ("dingin (unik)", paths, len(paths), False),
+        ("cache respons", paths, args.requests, False),
+        ("kondisional (304)", paths, args.requests, True),
+    ]
+    for label, scenario_paths, total, conditional in scenarios:
+        result = run_load(host, port, scenario_paths, total, args.concurrency, conditional)
+        print(
+            f"{label:<22}{result['req_s']:>10.0f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}  {result['statuses']}"
+        )
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
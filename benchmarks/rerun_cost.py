@@ -0,0 +1,69 @@
+"""Ukur waktu hingga KPI pertama dan ukuran elemen yang dikirim per rerun.
+
+Jalankan dari root repo (butuh data/global_05212025.xlsx):
+
+    python benchmarks/rerun_cost.py
+"""
+import sys
+import time
+from pathlib import Path
+
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ["1_Global.py", "pages/2_Negara.py", "pages/3_Subnasional.py"]
+
+# AppTest tidak menambahkan root repo ke sys.path; halaman mengimpor `utils`
+sys.path.insert(0, str(ROOT))
+
+
+def _element_bytes(node):
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if proto is not None and hasattr(proto, "ByteSize") else 0
+    for child in getattr(node, "children", {}).values():
+        size += _element_bytes(child)
+    return size
+
+
+def measure_run(app):
+    # Catat waktu saat st.metric pertama kali dipanggil
+    first_metric = []
+    original_metric = DeltaGenerator.metric
+
+    def timed_metric(self, *args, **kwargs):
+        if not first_metric:
+            first_metric.append(time.perf_counter())
+        return original_metric(self, *args, **kwargs)
+
+    DeltaGenerator.metric = timed_metric
+    try:
+        start = time.perf_counter()
+        app.run()
+        end = time.perf_counter()
+    finally:
+        DeltaGenerator.metric = original_metric
+
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return {
+        "first_kpi_s": first_metric[0] - start if first_metric else None,
+        "total_s": end - start,
+        "bytes": _element_bytes(app._tree),
+    }
+
+
+def main():
+    print(f"{'halaman':<24}{'run':<8}{'kpi (s)':>10}{'total (s)':>11}{'bytes':>12}")
+    for page in PAGES:
+        app = AppTest.from_file(str(ROOT / page), default_timeout=120)
+        for label in ["dingin", "rerun"]:
+            result = measure_run(app)
+            print(
+                f"{page:<24}{label:<8}{result['first_kpi_s']:>10.3f}"
+                f"{result['total_s']:>11.3f}{result['bytes']:>12,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from random import choice
-import plotly.colors as pc
+from utils.data_loader import FIGURE_CACHE_ENTRIES, assign_colors, load_excel_data
+from utils.filter_state import get_shared_filter, seed_widget_state, set_shared_filter
+from utils.prefetch import prefetch_subnational
 
 st.set_page_config(page_title="Deforestasi dan Emisi Karbon", layout="wide")
 st.title("Deforestasi dan Emisi Karbon Negara")
@@ -11,9 +12,9 @@ st.title("Deforestasi dan Emisi Karbon Negara")
 # =====================================
 # 🗕️ Load Data
 # =====================================
-tree_cover_loss_df = pd.read_excel("data/global_05212025.xlsx", sheet_name="Country tree cover loss")
-primary_loss_df = pd.read_excel("data/global_05212025.xlsx", sheet_name="Country primary loss")
-carbon_df = pd.read_excel("data/global_05212025.xlsx", sheet_name="Country carbon data")
+tree_cover_loss_df = load_excel_data("Country tree cover loss")
+primary_loss_df = load_excel_data("Country primary loss")
+carbon_df = load_excel_data("Country carbon data")
 
 # =====================================
 # 📌 Sidebar Filter
@@ -21,18 +22,28 @@ carbon_df = pd.read_excel("data/global_05212025.xlsx", sheet_name="Country carbo
 st.sidebar.title("Filter")
 
 country_list = sorted(tree_cover_loss_df['country'].unique())
-default_countries = ["Indonesia", "Brazil"]
-default_selected = [c for c in default_countries if c in country_list]
+default_countries = get_shared_filter("countries", ["Indonesia", "Brazil"])
+seed_widget_state("negara_countries", [c for c in default_countries if c in country_list])
 selected_countries = st.sidebar.multiselect(
     "Pilih Negara",
     country_list,
-    default=default_selected,
+    key="negara_countries",
     help="Pilih satu atau lebih negara untuk dibandingkan"
 )
 
-tahun_min, tahun_max = st.sidebar.slider("Rentang Tahun", 2001, 2024, (2001, 2024))
+seed_widget_state("negara_years", get_shared_filter("years", (2001, 2024)))
+tahun_min, tahun_max = st.sidebar.slider("Rentang Tahun", 2001, 2024, key="negara_years")
 thresholds = sorted(tree_cover_loss_df['threshold'].unique())
-selected_threshold = st.sidebar.selectbox("Threshold (%)", thresholds)
+shared_threshold = get_shared_filter("threshold", thresholds[0])
+seed_widget_state("negara_threshold", shared_threshold if shared_threshold in thresholds else thresholds[0])
+selected_threshold = st.sidebar.selectbox("Threshold (%)", thresholds, key="negara_threshold")
+
+set_shared_filter("countries", selected_countries)
+set_shared_filter("years", (tahun_min, tahun_max))
+set_shared_filter("threshold", selected_threshold)
+
+# Siapkan data & grafik default subnasional negara terpilih di latar belakang
+prefetch_subnational(selected_countries, tahun_min, tahun_max, selected_threshold)
 
 st.sidebar.info(
     "Threshold adalah ambang minimum persentase tajuk pohon yang dihitung sebagai hutan."
@@ -52,19 +63,7 @@ mask_p = [y for y in years_p if tahun_min <= y <= tahun_max]
 # =====================================
 # 📌 Warna Negara
 # =====================================
-warna_preset = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
-extra_colors = pc.qualitative.Plotly + pc.qualitative.Set3 + pc.qualitative.Pastel
-warna_negara = {}
-used_colors = set(warna_preset)
-
-for i, c in enumerate(selected_countries):
-    if i < len(warna_preset):
-        warna_negara[c] = warna_preset[i]
-    else:
-        unused_colors = [color for color in extra_colors if color not in used_colors]
-        chosen_color = choice(unused_colors) if unused_colors else choice(extra_colors)
-        warna_negara[c] = chosen_color
-        used_colors.add(chosen_color)
+warna_negara = assign_colors(selected_countries)
 
 # =====================================
 # 📌 Total KPI Cards
@@ -102,26 +101,39 @@ col3.metric("Total Emisi CO₂e", f"{total_emission:,.0f} Mg")
 
 st.markdown("---")
 
+# =====================================
+# 📌 Bagian Halaman
+# =====================================
+# Isi tab hanya dihitung saat tab dibuka; grafik yang sudah dibuat diambil dari cache
+tab_tren, tab_perbandingan, tab_total_emisi, tab_tren_emisi = st.tabs(
+    ["Tren Kehilangan Area Berpohon", "Perbandingan Kehilangan", "Total Emisi CO₂e", "Tren Emisi CO₂e"],
+    key="negara_section",
+    on_change="rerun"
+)
+
 # =====================================
 # 📌 Tren Kehilangan Area Berpohon
 # =====================================
-st.subheader(f"Tren Kehilangan Area Berpohon ({tahun_min}–{tahun_max})")
-st.write(f"*Threshold: {selected_threshold}%*")
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_tree_loss_trend(selected_countries, mask_years, tahun_min, tahun_max, selected_threshold, warna_negara):
+    tree_cover_loss_df = load_excel_data("Country tree cover loss")
 
-trend_data = []
-insight_data = []
-for c in selected_countries:
-    df_tc = tree_cover_loss_df[
-        (tree_cover_loss_df['country'] == c) &
-        (tree_cover_loss_df['threshold'] == selected_threshold)
-    ]
-    if not df_tc.empty:
-        losses = df_tc.iloc[0][[f'tc_loss_ha_{y}' for y in mask_years]].values
-        trend_data.append(pd.DataFrame({'Tahun': [str(y) for y in mask_years], 'Negara': c, 'Loss': losses}))
-        total_loss = losses.sum()
-        insight_data.append(f"**{c}** kehilangan total {total_loss:,.0f} ha pohon selama periode {tahun_min}-{tahun_max}.")
+    trend_data = []
+    insight_data = []
+    for c in selected_countries:
+        df_tc = tree_cover_loss_df[
+            (tree_cover_loss_df['country'] == c) &
+            (tree_cover_loss_df['threshold'] == selected_threshold)
+        ]
+        if not df_tc.empty:
+            losses = df_tc.iloc[0][[f'tc_loss_ha_{y}' for y in mask_years]].values
+            trend_data.append(pd.DataFrame({'Tahun': [str(y) for y in mask_years], 'Negara': c, 'Loss': losses}))
+            total_loss = losses.sum()
+            insight_data.append(f"**{c}** kehilangan total {total_loss:,.0f} ha pohon selama periode {tahun_min}-{tahun_max}.")
+
+    if not trend_data:
+        return None, insight_data
 
-if trend_data:
     df_trend = pd.concat(trend_data)
     fig_tc = px.line(
         df_trend, x="Tahun", y="Loss", color="Negara",
@@ -130,21 +142,33 @@ if trend_data:
         color_discrete_map=warna_negara
     )
     fig_tc.update_layout(yaxis=dict(rangemode="tozero"))  # <=== Mulai dari 0
-    st.plotly_chart(fig_tc, use_container_width=True)
-    st.info("\n\n".join(insight_data))
-else:
-    st.info("Data kehilangan area berpohon tidak tersedia.")
+    return fig_tc, insight_data
 
-st.markdown("---")
+
+if tab_tren.open:
+    with tab_tren:
+        st.subheader(f"Tren Kehilangan Area Berpohon ({tahun_min}–{tahun_max})")
+        st.write(f"*Threshold: {selected_threshold}%*")
+
+        fig_tc, insight_data = build_tree_loss_trend(
+            tuple(selected_countries), tuple(mask_years), tahun_min, tahun_max, selected_threshold, warna_negara
+        )
+        if fig_tc is not None:
+            st.plotly_chart(fig_tc, width="stretch")
+            st.info("\n\n".join(insight_data))
+        else:
+            st.info("Data kehilangan area berpohon tidak tersedia.")
 
 # =====================================
 # 📌 Perbandingan Kehilangan Hutan Primer dan Komposisi Kehilangan Area Berpohon
 # =====================================
-st.markdown(f"### Perbandingan Kehilangan Hutan Primer dan Komposisi Kehilangan Area Berpohon ({tahun_min}–{tahun_max})")
-col_pie, col_bar = st.columns(2)
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_loss_comparison(selected_countries, mask_years, mask_p, tahun_min, tahun_max, selected_threshold, warna_negara):
+    tree_cover_loss_df = load_excel_data("Country tree cover loss")
+    primary_loss_df = load_excel_data("Country primary loss")
 
-# Donut Chart
-with col_pie:
+    # Donut Chart
+    fig_pie = None
     pie_data = []
     for c in selected_countries:
         df_c = tree_cover_loss_df[
@@ -169,10 +193,9 @@ with col_pie:
             legend_title_text="Negara",
             margin=dict(t=50, b=40, l=40, r=40)
         )
-        st.plotly_chart(fig_pie, use_container_width=True)
 
-# Stacked Bar Chart
-with col_bar:
+    # Stacked Bar Chart
+    fig_bar = None
     comp_data = []
     for c in selected_countries:
         df_c = primary_loss_df[primary_loss_df['country'] == c]
@@ -192,86 +215,111 @@ with col_bar:
             title_text=f"Perbandingan Kehilangan Hutan Primer ({tahun_min}–{tahun_max})",
             margin=dict(t=50, b=40, l=40, r=40)
         )
-        st.plotly_chart(fig_bar, use_container_width=True)
+    return fig_pie, fig_bar
 
-st.info(
-    f"Diagram di atas menunjukkan perbandingan kehilangan hutan primer (kanan) dan komposisi kehilangan area berpohon (kiri) "
-    f"antara dan negara pembanding selama {tahun_min}-{tahun_max}. "
-    f"Negara yang tampil di donut chart namun tidak muncul di stacked bar chart berarti tidak memiliki data kehilangan hutan primer pada periode tersebut."
-)
 
-st.markdown("---")
+if tab_perbandingan.open:
+    with tab_perbandingan:
+        st.markdown(f"### Perbandingan Kehilangan Hutan Primer dan Komposisi Kehilangan Area Berpohon ({tahun_min}–{tahun_max})")
+
+        fig_pie, fig_bar = build_loss_comparison(
+            tuple(selected_countries), tuple(mask_years), tuple(mask_p),
+            tahun_min, tahun_max, selected_threshold, warna_negara
+        )
+        col_pie, col_bar = st.columns(2)
+        if fig_pie is not None:
+            col_pie.plotly_chart(fig_pie, width="stretch")
+        if fig_bar is not None:
+            col_bar.plotly_chart(fig_bar, width="stretch")
+
+        st.info(
+            f"Diagram di atas menunjukkan perbandingan kehilangan hutan primer (kanan) dan komposisi kehilangan area berpohon (kiri) "
+            f"antara dan negara pembanding selama {tahun_min}-{tahun_max}. "
+            f"Negara yang tampil di donut chart namun tidak muncul di stacked bar chart berarti tidak memiliki data kehilangan hutan primer pada periode tersebut."
+        )
 
 # =====================================
 # 📌 Perbandingan Total Emisi CO₂e Negara Terpilih
 # =====================================
-st.markdown(f"### Perbandingan Total Emisi CO₂e Negara Terpilih ({tahun_min}–{tahun_max})")
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_total_emission(selected_countries, tahun_min, tahun_max, warna_negara):
+    carbon_df = load_excel_data("Country carbon data")
+
+    emission_cols_selected = [
+        f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e'
+        for y in range(tahun_min, tahun_max + 1)
+        if f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e' in carbon_df.columns
+    ]
 
-emission_cols_selected = [
-    f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e'
-    for y in range(tahun_min, tahun_max + 1)
-    if f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e' in carbon_df.columns
-]
+    top_emission_selected = carbon_df[carbon_df['country'].isin(selected_countries)].copy()
+    top_emission_selected['total_emission_selected'] = top_emission_selected[emission_cols_selected].sum(axis=1)
+    top_emission_selected = top_emission_selected.sort_values('total_emission_selected', ascending=False)
 
-carbon_df['total_emission_selected'] = carbon_df[emission_cols_selected].sum(axis=1)
-top_emission_selected = carbon_df[carbon_df['country'].isin(selected_countries)].sort_values(
-    'total_emission_selected', ascending=False
-)
+    fig_bar_total = px.bar(
+        top_emission_selected,
+        x='country', y='total_emission_selected',
+        labels={'country': 'Negara', 'total_emission_selected': 'Total Emisi (Mg CO₂e)'},
+        color='country',
+        color_discrete_map=warna_negara
+    )
+    fig_bar_total.update_layout(yaxis=dict(rangemode="tozero"))
+    return fig_bar_total
 
-fig_bar_total = px.bar(
-    top_emission_selected,
-    x='country', y='total_emission_selected',
-    labels={'country': 'Negara', 'total_emission_selected': 'Total Emisi (Mg CO₂e)'},
-    color='country',
-    color_discrete_map=warna_negara
-)
-fig_bar_total.update_layout(yaxis=dict(rangemode="tozero"))
-st.plotly_chart(fig_bar_total, use_container_width=True)
 
-st.markdown("---")
+if tab_total_emisi.open:
+    with tab_total_emisi:
+        st.markdown(f"### Perbandingan Total Emisi CO₂e Negara Terpilih ({tahun_min}–{tahun_max})")
+        st.plotly_chart(
+            build_total_emission(tuple(selected_countries), tahun_min, tahun_max, warna_negara),
+            width="stretch"
+        )
 
 # =====================================
 # 📌 Tren Emisi CO₂e
 # =====================================
-st.markdown(f"### Tren Emisi CO₂e ({tahun_min}–{tahun_max})")
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_emission_trend(selected_countries, mask_p, warna_negara):
+    carbon_df = load_excel_data("Country carbon data")
+
+    emission_trend_data = []
+    insight_emissions = []
+    for c in selected_countries:
+        df_carbon = carbon_df[carbon_df['country'] == c]
+        if not df_carbon.empty:
+            carbon_cols = [
+                f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e'
+                for y in mask_p if f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e' in df_carbon.columns
+            ]
+            if carbon_cols:
+                emissions = df_carbon.iloc[0][carbon_cols].values
+                years_emission = [int(col.split('_')[5]) for col in carbon_cols]
+
+                emission_trend_data.append(pd.DataFrame({
+                    'Tahun': [str(y) for y in years_emission],
+                    'Negara': c,
+                    'Emisi': emissions
+                }))
+
+                max_idx = emissions.argmax()
+                min_idx = emissions.argmin()
+                tahun_max_em = years_emission[max_idx]
+                tahun_min_em = years_emission[min_idx]
+                emisi_max = emissions[max_idx]
+                emisi_min = emissions[min_idx]
+                emisi_avg = emissions.mean()
+                selisih = emisi_max - emisi_min
+
+                insight_emissions.append(
+                    f"**{c}**\n"
+                    f"- Tahun tertinggi: {tahun_max_em} ({emisi_max:,.0f} Mg CO₂e). "
+                    f"Tahun terendah: {tahun_min_em} ({emisi_min:,.0f} Mg CO₂e). "
+                    f"Rata-rata per tahun: {emisi_avg:,.0f} Mg CO₂e. "
+                    f"Selisih tertinggi-terendah: {selisih:,.0f} Mg CO₂e."
+                )
+
+    if not emission_trend_data:
+        return None, insight_emissions
 
-emission_trend_data = []
-insight_emissions = []
-for c in selected_countries:
-    df_carbon = carbon_df[carbon_df['country'] == c]
-    if not df_carbon.empty:
-        carbon_cols = [
-            f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e'
-            for y in mask_p if f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e' in df_carbon.columns
-        ]
-        if carbon_cols:
-            emissions = df_carbon.iloc[0][carbon_cols].values
-            years_emission = [int(col.split('_')[5]) for col in carbon_cols]
-
-            emission_trend_data.append(pd.DataFrame({
-                'Tahun': [str(y) for y in years_emission],
-                'Negara': c,
-                'Emisi': emissions
-            }))
-
-            max_idx = emissions.argmax()
-            min_idx = emissions.argmin()
-            tahun_max_em = years_emission[max_idx]
-            tahun_min_em = years_emission[min_idx]
-            emisi_max = emissions[max_idx]
-            emisi_min = emissions[min_idx]
-            emisi_avg = emissions.mean()
-            selisih = emisi_max - emisi_min
-
-            insight_emissions.append(
-                f"**{c}**\n"
-                f"- Tahun tertinggi: {tahun_max_em} ({emisi_max:,.0f} Mg CO₂e). "
-                f"Tahun terendah: {tahun_min_em} ({emisi_min:,.0f} Mg CO₂e). "
-                f"Rata-rata per tahun: {emisi_avg:,.0f} Mg CO₂e. "
-                f"Selisih tertinggi-terendah: {selisih:,.0f} Mg CO₂e."
-            )
-
-if emission_trend_data:
     df_emission_trend = pd.concat(emission_trend_data)
     fig_emission = px.line(
         df_emission_trend, x="Tahun", y="Emisi", color="Negara",
@@ -280,7 +328,16 @@ if emission_trend_data:
         color_discrete_map=warna_negara
     )
     fig_emission.update_layout(yaxis=dict(rangemode="tozero"))  # Mulai dari 0
-    st.plotly_chart(fig_emission, use_container_width=True)
-    st.info("\n\n".join(insight_emissions))
-else:
-    st.info("Data emisi tidak tersedia.")
+    return fig_emission, insight_emissions
+
+
+if tab_tren_emisi.open:
+    with tab_tren_emisi:
+        st.markdown(f"### Tren Emisi CO₂e ({tahun_min}–{tahun_max})")
+
+        fig_emission, insight_emissions = build_emission_trend(tuple(selected_countries), tuple(mask_p), warna_negara)
+        if fig_emission is not None:
+            st.plotly_chart(fig_emission, width="stretch")
+            st.info("\n\n".join(insight_emissions))
+        else:
+            st.info("Data emisi tidak tersedia.")
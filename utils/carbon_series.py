@@ -0,0 +1,110 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import load_excel_data
+
+COUNTRY_CARBON_SHEET = "Country carbon data"
+THRESHOLD_COL = "umd_tree_cover_density_2000__threshold"
+EMISSION_YEAR_PREFIX = "gfw_forest_carbon_gross_emissions_"
+EMISSION_YEAR_SUFFIX = "__Mg_CO2e"
+EMISSION_AVG_COL = "gfw_forest_carbon_gross_emissions__Mg_CO2e_yr-1"
+REMOVALS_AVG_COL = "gfw_forest_carbon_gross_removals__Mg_CO2_yr-1"
+NET_FLUX_AVG_COL = "gfw_forest_carbon_net_flux__Mg_CO2e_yr-1"
+
+
+def _emission_year(col):
+    # gfw_forest_carbon_gross_emissions_2001__Mg_CO2e -> 2001
+    middle = col[len(EMISSION_YEAR_PREFIX):-len(EMISSION_YEAR_SUFFIX)]
+    return int(middle) if middle.isdigit() else None
+
+
+@st.cache_data
+def load_carbon_series(threshold=30):
+    """Matriks emisi per negara x tahun beserta jumlah kumulatifnya.
+
+    Total emisi untuk rentang tahun mana pun dihitung dari selisih dua kolom
+    kumulatif, tanpa menjumlah ulang kolom tahunan di setiap rerun.
+    Penyerapan hanya tersedia sebagai rata-rata tahunan, jadi disimpan apa adanya.
+    """
+    df = load_excel_data(COUNTRY_CARBON_SHEET)
+    df = df[df[THRESHOLD_COL] == threshold].reset_index(drop=True)
+
+    year_cols = {
+        _emission_year(col): col
+        for col in df.columns
+        if col.startswith(EMISSION_YEAR_PREFIX) and col.endswith(EMISSION_YEAR_SUFFIX)
+    }
+    year_cols.pop(None, None)
+    years = sorted(year_cols)
+
+    emissions = df[[year_cols[y] for y in years]].fillna(0).to_numpy(dtype=float)
+    emissions_cumsum = np.zeros((len(df), len(years) + 1))
+    emissions_cumsum[:, 1:] = np.cumsum(emissions, axis=1)
+
+    removals = df[REMOVALS_AVG_COL].fillna(0).to_numpy(dtype=float)
+
+    return {
+        "years": years,
+        "countries": df["country"].tolist(),
+        "emissions_cumsum": emissions_cumsum,
+        "global_emissions_cumsum": emissions_cumsum.sum(axis=0),
+        "removals_annual": removals,
+        "global_removals_annual": removals.sum(),
+    }
+
+
+def year_bounds(series, start_year, end_year):
+    # Indeks kolom kumulatif: total = cumsum[end] - cumsum[start]
+    years = series["years"]
+    start = bisect_left(years, start_year)
+    end = max(start, bisect_right(years, end_year))
+    return start, end
+
+
+def global_carbon_totals(series, start_year, end_year):
+    """Total emisi, penyerapan, dan net flux global untuk rentang tahun."""
+    start, end = year_bounds(series, start_year, end_year)
+    cumsum = series["global_emissions_cumsum"]
+    emissions = cumsum[end] - cumsum[start]
+    removals = series["global_removals_annual"] * (end - start)
+    return {"emissions": emissions, "removals": removals, "net_flux": emissions - removals}
+
+
+def country_emissions(series, start_year, end_year):
+    """Total emisi per negara untuk rentang tahun."""
+    start, end = year_bounds(series, start_year, end_year)
+    cumsum = series["emissions_cumsum"]
+    return pd.DataFrame({
+        "country": series["countries"],
+        "emissions": cumsum[:, end] - cumsum[:, start],
+        "years": end - start,
+    })
+
+
+def compare_with_annual_average(threshold=30, total_years_available=23):
+    """Bandingkan total per tahun dengan pendekatan lama (rata-rata tahunan x proporsi tahun)."""
+    series = load_carbon_series(threshold)
+    df = load_excel_data(COUNTRY_CARBON_SHEET)
+    df = df[df[THRESHOLD_COL] == threshold]
+
+    rows = []
+    for start_year, end_year in [(series["years"][0], series["years"][-1]), (2002, 2024), (2015, 2024), (2020, 2020)]:
+        exact = global_carbon_totals(series, start_year, end_year)
+        n_years = end_year - start_year + 1
+        scale = n_years / total_years_available
+        rows.append({
+            "rentang": f"{start_year}-{end_year}",
+            "emisi_per_tahun": exact["emissions"],
+            "emisi_rata_rata_x_tahun": df[EMISSION_AVG_COL].sum() * n_years,
+            "emisi_pendekatan": df[EMISSION_AVG_COL].sum() * scale,
+            "net_flux_per_tahun": exact["net_flux"],
+            "net_flux_pendekatan": df[NET_FLUX_AVG_COL].sum() * scale,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print(compare_with_annual_average().to_string(index=False))
@@ -1,6 +1,81 @@
 import pandas as pd
+import plotly.colors as pc
 import streamlit as st
 
+DATA_PATH = "data/global_05212025.xlsx"
+
+# Batas entri cache untuk builder grafik per halaman (satu entri per kombinasi filter)
+FIGURE_CACHE_ENTRIES = 32
+
+# Warna per negara/subnasional, sama di halaman Negara dan Subnasional
+WARNA_PRESET = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+EXTRA_COLORS = pc.qualitative.Plotly + pc.qualitative.Set3 + pc.qualitative.Pastel
+
+SUBNATIONAL_TREE_LOSS_SHEET = "Subnational 1 tree cover loss"
+SUBNATIONAL_PRIMARY_LOSS_SHEET = "Subnational 1 primary loss"
+SUBNATIONAL_CARBON_SHEET = "Subnational 1 carbon data"
+SUBNATIONAL_SHEETS = (
+    SUBNATIONAL_TREE_LOSS_SHEET,
+    SUBNATIONAL_PRIMARY_LOSS_SHEET,
+    SUBNATIONAL_CARBON_SHEET,
+)
+
+
 @st.cache_data
 def load_excel_data(sheet_name):
-    return pd.read_excel("data/global_05212025.xlsx", sheet_name=sheet_name)
\ No newline at end of file
+    return pd.read_excel(DATA_PATH, sheet_name=sheet_name)
+
+
+@st.cache_data
+def load_subnational_data(sheet_name):
+    df = load_excel_data(sheet_name)
+    # Tambahkan kolom gabungan: Country - Subnational
+    df['sub_display'] = df['country'] + " - " + df['subnational1']
+    return df
+
+
+@st.cache_data
+def load_subnational_countries():
+    return sorted(load_subnational_data(SUBNATIONAL_TREE_LOSS_SHEET)['country'].unique())
+
+
+@st.cache_data
+def load_subnational_thresholds():
+    return sorted(load_subnational_data(SUBNATIONAL_TREE_LOSS_SHEET)['threshold'].unique())
+
+
+@st.cache_data
+def load_subnational_partition(sheet_name, country):
+    # Partisi per negara agar filter subnasional tidak memindai seluruh sheet
+    df = load_subnational_data(sheet_name)
+    return df[df['country'] == country].reset_index(drop=True)
+
+
+@st.cache_data
+def load_subnational_index(country):
+    # Daftar "Country - Subnational" untuk satu negara (isi pilihan sidebar)
+    df = load_subnational_partition(SUBNATIONAL_TREE_LOSS_SHEET, country)
+    return sorted(df['sub_display'].unique())
+
+
+def load_subnational_selection(sheet_name, countries):
+    partitions = [load_subnational_partition(sheet_name, c) for c in countries]
+    if not partitions:
+        return load_subnational_data(sheet_name).iloc[0:0]
+    return pd.concat(partitions, ignore_index=True)
+
+
+def assign_colors(items):
+    warna = {}
+    used_colors = set(WARNA_PRESET)
+
+    for i, s in enumerate(items):
+        if i < len(WARNA_PRESET):
+            warna[s] = WARNA_PRESET[i]
+        else:
+            unused_colors = [color for color in EXTRA_COLORS if color not in used_colors]
+            # Urutan tetap (bukan acak) agar argumen cache builder grafik stabil antar rerun
+            chosen_color = unused_colors[0] if unused_colors else EXTRA_COLORS[i % len(EXTRA_COLORS)]
+            warna[s] = chosen_color
+            used_colors.add(chosen_color)
+    return warna
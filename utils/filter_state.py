@@ -0,0 +1,20 @@
+import streamlit as st
+
+# State filter yang dibagi antar halaman. Disimpan di key terpisah dari key
+# widget karena Streamlit menghapus state widget saat halamannya tidak dirender.
+SHARED_PREFIX = "shared_filter_"
+
+
+def get_shared_filter(name, default):
+    return st.session_state.get(SHARED_PREFIX + name, default)
+
+
+def set_shared_filter(name, value):
+    st.session_state[SHARED_PREFIX + name] = value
+
+
+def seed_widget_state(key, value):
+    # Widget memakai key tetap tanpa default/value/index agar ID-nya tidak
+    # berubah antar rerun; nilai awal diisi lewat session state sekali saja
+    if key not in st.session_state:
+        st.session_state[key] = value
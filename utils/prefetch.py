@@ -0,0 +1,128 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from utils.data_loader import (
+    SUBNATIONAL_PRIMARY_LOSS_SHEET,
+    SUBNATIONAL_SHEETS,
+    SUBNATIONAL_TREE_LOSS_SHEET,
+    assign_colors,
+    load_subnational_countries,
+    load_subnational_index,
+    load_subnational_partition,
+    load_subnational_selection,
+    load_subnational_thresholds,
+)
+from utils.subnational_figures import (
+    build_emission_charts,
+    build_loss_comparison,
+    build_tree_loss_trend,
+    default_subnational_selection,
+    loss_year_range,
+    subnational_options,
+)
+
+MAX_WORKERS = 2
+MAX_PREFETCH_COUNTRIES = 5
+JOB_KEY = "_subnational_prefetch_job"
+THREAD_PREFIX = "prefetch"
+SCRIPT_RUN_CONTEXT_LOGGER = "streamlit.runtime.scriptrunner_utils.script_run_context"
+
+
+class _PrefetchThreadFilter(logging.Filter):
+    # Worker prefetch sengaja berjalan tanpa ScriptRunContext; abaikan
+    # peringatan "missing ScriptRunContext" dari thread tersebut
+    def filter(self, record):
+        return not threading.current_thread().name.startswith(THREAD_PREFIX)
+
+
+@st.cache_resource
+def get_prefetch_executor():
+    # Satu pool untuk seluruh sesi agar jumlah thread tetap terbatas
+    logging.getLogger(SCRIPT_RUN_CONTEXT_LOGGER).addFilter(_PrefetchThreadFilter())
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=THREAD_PREFIX)
+
+
+def _warm_subnational(country, cancel_event):
+    # Cek pembatalan di antara setiap langkah; langkah yang sedang berjalan
+    # tetap diselesaikan karena hasilnya masuk ke cache bersama
+    for sheet_name in SUBNATIONAL_SHEETS:
+        if cancel_event.is_set():
+            return
+        load_subnational_partition(sheet_name, country)
+    if not cancel_event.is_set():
+        load_subnational_index(country)
+
+
+def _warm_default_figures(countries, tahun_min, tahun_max, threshold, country_futures, cancel_event):
+    # Job ini dikirim setelah job per negara, jadi job yang ditunggu sudah
+    # diambil worker lebih dulu (antrian FIFO) dan tidak terjadi deadlock
+    wait(country_futures)
+
+    # Ulangi pemilihan default halaman Subnasional agar argumen builder,
+    # dan dengan itu kunci cache grafik, sama persis dengan yang dipakai halaman
+    available = set(load_subnational_countries())
+    countries = tuple(c for c in countries if c in available)
+    thresholds = load_subnational_thresholds()
+    threshold = next((t for t in thresholds if t == threshold), thresholds[0])
+
+    tree_loss_df = load_subnational_selection(SUBNATIONAL_TREE_LOSS_SHEET, countries)
+    primary_loss_df = load_subnational_selection(SUBNATIONAL_PRIMARY_LOSS_SHEET, countries)
+    year_range = tuple(loss_year_range(tree_loss_df, tahun_min, tahun_max))
+    prim_range = tuple(loss_year_range(primary_loss_df, tahun_min, tahun_max))
+    selected_sub_display = tuple(default_subnational_selection(subnational_options(countries)))
+    warna = assign_colors(selected_sub_display)
+
+    builders = [
+        lambda: build_tree_loss_trend(
+            countries, selected_sub_display, year_range, tahun_min, tahun_max, threshold, warna
+        ),
+        lambda: build_loss_comparison(
+            countries, selected_sub_display, year_range, prim_range, tahun_min, tahun_max, threshold, warna
+        ),
+        lambda: build_emission_charts(
+            countries, selected_sub_display, prim_range, tahun_min, tahun_max, warna
+        ),
+    ]
+    for build in builders:
+        if cancel_event.is_set():
+            return
+        build()
+
+
+def _cancel_job(job):
+    job["cancel_event"].set()
+    for future in job["futures"]:
+        future.cancel()
+
+
+def prefetch_subnational(countries, tahun_min, tahun_max, threshold):
+    """Panaskan cache data & grafik default subnasional untuk negara terpilih di latar belakang.
+
+    Job sebelumnya dibatalkan jika pilihan filter berubah.
+    """
+    key = (tuple(countries), tahun_min, tahun_max, threshold)
+    job = st.session_state.get(JOB_KEY)
+    if job is not None and job["key"] == key:
+        return
+    if job is not None:
+        _cancel_job(job)
+
+    executor = get_prefetch_executor()
+    cancel_event = threading.Event()
+    futures = [
+        executor.submit(_warm_subnational, c, cancel_event)
+        for c in countries[:MAX_PREFETCH_COUNTRIES]
+    ]
+    # Grafik default bergantung pada semua negara terpilih; lewati jika tidak semuanya diprefetch
+    if countries and len(countries) <= MAX_PREFETCH_COUNTRIES:
+        futures.append(executor.submit(
+            _warm_default_figures, tuple(countries), tahun_min, tahun_max, threshold, list(futures), cancel_event
+        ))
+    st.session_state[JOB_KEY] = {
+        "key": key,
+        "cancel_event": cancel_event,
+        "futures": futures,
+    }
@@ -0,0 +1,184 @@
+import numpy as np
+
+from utils.carbon_series import THRESHOLD_COL, global_carbon_totals, load_carbon_series, year_bounds
+from utils.data_loader import (
+    SUBNATIONAL_CARBON_SHEET,
+    SUBNATIONAL_PRIMARY_LOSS_SHEET,
+    SUBNATIONAL_TREE_LOSS_SHEET,
+    load_excel_data,
+    load_subnational_data,
+)
+
+LOSS_PREFIX = "tc_loss_ha_"
+EMISSION_PREFIX = "gfw_forest_carbon_gross_emissions_"
+EMISSION_SUFFIX = "__Mg_CO2e"
+METRICS = ("tree_loss", "primary_loss", "emissions")
+# Nama kolom threshold berbeda antara sheet kehilangan hutan dan sheet karbon
+THRESHOLD_COLUMNS = ("threshold", THRESHOLD_COL)
+
+
+def _year_columns(df, prefix, suffix=""):
+    columns = {}
+    for col in df.columns:
+        if col.startswith(prefix) and col.endswith(suffix):
+            middle = col[len(prefix):len(col) - len(suffix)]
+            if middle.isdigit():
+                columns[int(middle)] = col
+    years = sorted(columns)
+    return years, [columns[y] for y in years]
+
+
+def _series_table(df, key_cols, prefix, suffix=""):
+    """Nilai per baris x tahun dengan jumlah kumulatif untuk total rentang O(1).
+
+    Jika satu kunci muncul di beberapa baris, baris pertama dipakai
+    (sama seperti `.iloc[0]` di halaman dashboard).
+    """
+    years, cols = _year_columns(df, prefix, suffix)
+    values = df[cols].fillna(0).to_numpy(dtype=float)
+    cumsum = np.zeros((len(df), len(years) + 1))
+    cumsum[:, 1:] = np.cumsum(values, axis=1)
+
+    rows = {}
+    for i, key in enumerate(zip(*(df[c] for c in key_cols))):
+        rows.setdefault(tuple(k.item() if hasattr(k, "item") else k for k in key), i)
+    return {"years": years, "values": values, "cumsum": cumsum, "rows": rows, "by_threshold": len(key_cols) > 1}
+
+
+def _area_table(df, name_col, prefix, suffix=""):
+    # Kunci (nama, threshold) jika sheet punya kolom threshold, agar semua
+    # metrik satu respons berasal dari threshold yang sama
+    threshold_cols = [col for col in THRESHOLD_COLUMNS if col in df.columns]
+    return _series_table(df, [name_col] + threshold_cols[:1], prefix, suffix)
+
+
+def _area_index(tree_loss_df, primary_loss_df, carbon_df, name_col):
+    return {
+        "tree_loss": _area_table(tree_loss_df, name_col, LOSS_PREFIX),
+        "primary_loss": _area_table(primary_loss_df, name_col, LOSS_PREFIX),
+        "emissions": _area_table(carbon_df, name_col, EMISSION_PREFIX, EMISSION_SUFFIX),
+    }
+
+
+def _global_index(tree_loss_df, primary_loss_df):
+    index = {}
+    for threshold in sorted(tree_loss_df["threshold"].unique()):
+        threshold = threshold.item() if hasattr(threshold, "item") else threshold
+        tree = tree_loss_df[tree_loss_df["threshold"] == threshold]
+        primary = primary_loss_df[primary_loss_df["threshold"] == threshold]
+        carbon = load_carbon_series(threshold=threshold)
+        index[threshold] = {
+            "tree_loss": _series_table(tree.assign(scope="global"), ["scope"], LOSS_PREFIX),
+            "primary_loss": _series_table(primary.assign(scope="global"), ["scope"], LOSS_PREFIX),
+            "carbon": carbon,
+        }
+        # Jumlahkan seluruh negara menjadi satu baris global
+        for metric in ("tree_loss", "primary_loss"):
+            table = index[threshold][metric]
+            table["values"] = table["values"].sum(axis=0, keepdims=True)
+            table["cumsum"] = table["cumsum"].sum(axis=0, keepdims=True)
+            # Tanpa baris sumber (threshold tidak ada di sheet) metrik bernilai null, bukan 0
+            table["rows"] = {("global",): 0} if table["rows"] else {}
+    return index
+
+
+def build_query_index():
+    """Bangun indeks baca-saja dari loader yang sama dengan halaman dashboard."""
+    country_tree = load_excel_data("Country tree cover loss")
+    country_primary = load_excel_data("Country primary loss")
+    country_carbon = load_excel_data("Country carbon data")
+    index = {
+        "country": _area_index(country_tree, country_primary, country_carbon, "country"),
+        "subnational": _area_index(
+            load_subnational_data(SUBNATIONAL_TREE_LOSS_SHEET),
+            load_subnational_data(SUBNATIONAL_PRIMARY_LOSS_SHEET),
+            load_subnational_data(SUBNATIONAL_CARBON_SHEET),
+            "sub_display",
+        ),
+        "global": _global_index(country_tree, country_primary),
+    }
+    years = [
+        year
+        for scope in ("country", "subnational")
+        for table in index[scope].values()
+        for year in table["years"]
+    ]
+    index["years"] = (min(years), max(years))
+    return index
+
+
+def available_years(index):
+    """Tahun pertama dan terakhir yang ada di data."""
+    return index["years"]
+
+
+def area_names(index, scope):
+    if scope == "global":
+        return ["global"]
+    return sorted({key[0] for key in index[scope]["tree_loss"]["rows"]})
+
+
+def range_total(table, row, start_year, end_year):
+    start, end = year_bounds(table, start_year, end_year)
+    # Tidak ada kolom tahun dalam rentang: data tidak tersedia, bukan kehilangan nol
+    if start == end:
+        return None
+    return float(table["cumsum"][row, end] - table["cumsum"][row, start])
+
+
+def range_series(table, row, start_year, end_year):
+    start, end = year_bounds(table, start_year, end_year)
+    return table["years"][start:end], table["values"][row, start:end].tolist()
+
+
+def _area_tables(index, scope, name, threshold):
+    """Pasangan (tabel, baris) per metrik; None jika area tidak punya data."""
+    if scope == "global":
+        tables = index["global"].get(threshold)
+        if tables is None:
+            return None
+        return {
+            metric: (tables[metric], tables[metric]["rows"].get(("global",)))
+            for metric in ("tree_loss", "primary_loss")
+        }
+
+    result = {}
+    for metric in METRICS:
+        table = index[scope][metric]
+        key = (name, threshold) if table["by_threshold"] else (name,)
+        result[metric] = (table, table["rows"].get(key))
+    return result
+
+
+def query_kpi(index, scope, name, threshold, start_year, end_year):
+    tables = _area_tables(index, scope, name, threshold)
+    if tables is None or all(row is None for _, row in tables.values()):
+        return None
+
+    result = {
+        metric: None if row is None else range_total(table, row, start_year, end_year)
+        for metric, (table, row) in tables.items()
+    }
+    if scope == "global":
+        series = index["global"][threshold]["carbon"]
+        start, end = year_bounds(series, start_year, end_year)
+        carbon = global_carbon_totals(series, start_year, end_year)
+        result.update({key: None if start == end else float(value) for key, value in carbon.items()})
+    return result
+
+
+def query_series(index, scope, name, threshold, metric, start_year, end_year):
+    if scope == "global" and metric == "emissions":
+        tables = index["global"].get(threshold)
+        if tables is None:
+            return None
+        carbon = tables["carbon"]
+        start, end = year_bounds(carbon, start_year, end_year)
+        cumsum = carbon["global_emissions_cumsum"]
+        return {"years": carbon["years"][start:end], "values": np.diff(cumsum[start:end + 1]).tolist()}
+
+    tables = _area_tables(index, scope, name, threshold)
+    if tables is None or tables[metric][1] is None:
+        return None
+    years, values = range_series(*tables[metric], start_year, end_year)
+    return {"years": years, "values": values}
@@ -0,0 +1,139 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from utils.data_loader import (
+    FIGURE_CACHE_ENTRIES,
+    SUBNATIONAL_CARBON_SHEET,
+    SUBNATIONAL_PRIMARY_LOSS_SHEET,
+    SUBNATIONAL_TREE_LOSS_SHEET,
+    load_subnational_index,
+    load_subnational_selection,
+)
+
+# Builder grafik halaman Subnasional; dipakai halaman dan prefetcher agar
+# kunci cache grafik default sama persis
+
+DEFAULT_SUBNATIONAL_MATCHES = ["Aceh", "Bahia"]
+
+
+def subnational_options(countries):
+    # Daftar "Country - Subnational" untuk negara terpilih
+    return sorted(s for c in countries for s in load_subnational_index(c))
+
+
+def default_subnational_selection(options):
+    return [s for s in options if any(x in s for x in DEFAULT_SUBNATIONAL_MATCHES)]
+
+
+def loss_year_range(df, tahun_min, tahun_max):
+    years_cols = [col for col in df.columns if col.startswith('tc_loss_ha_')]
+    years = [int(col.split('_')[-1]) for col in years_cols]
+    return [y for y in years if tahun_min <= y <= tahun_max]
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_tree_loss_trend(selected_countries, selected_sub_display, year_range, tahun_min, tahun_max, selected_threshold, warna_negara):
+    tree_loss_df = load_subnational_selection(SUBNATIONAL_TREE_LOSS_SHEET, selected_countries)
+
+    trend_data = []
+    insight_data = []
+
+    for s in selected_sub_display:
+        df_tc = tree_loss_df[(tree_loss_df['sub_display'] == s) & (tree_loss_df['threshold'] == selected_threshold)]
+        if not df_tc.empty:
+            losses = df_tc.iloc[0][[f'tc_loss_ha_{y}' for y in year_range]].values
+            trend_data.append(pd.DataFrame({'Tahun': [str(y) for y in year_range], 'Subnasional': s, 'Loss': losses}))
+            insight_data.append(f"**{s}** kehilangan total {losses.sum():,.0f} ha pohon selama periode {tahun_min}–{tahun_max}.")
+
+    if not trend_data:
+        return None, insight_data
+
+    df_trend = pd.concat(trend_data)
+    fig_tc = px.line(df_trend, x="Tahun", y="Loss", color="Subnasional", markers=True,
+                     labels={'Loss': 'Kehilangan (ha)', 'Tahun': 'Tahun'},
+                     color_discrete_map=warna_negara)
+    fig_tc.update_layout(yaxis=dict(rangemode="tozero"))
+    return fig_tc, insight_data
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_loss_comparison(selected_countries, selected_sub_display, year_range, prim_range, tahun_min, tahun_max, selected_threshold, warna_negara):
+    tree_loss_df = load_subnational_selection(SUBNATIONAL_TREE_LOSS_SHEET, selected_countries)
+    primary_loss_df = load_subnational_selection(SUBNATIONAL_PRIMARY_LOSS_SHEET, selected_countries)
+
+    fig_pie = None
+    pie_data = []
+    for s in selected_sub_display:
+        df_s = tree_loss_df[(tree_loss_df['sub_display'] == s) & (tree_loss_df['threshold'] == selected_threshold)]
+        if not df_s.empty:
+            total = df_s.iloc[0][[f'tc_loss_ha_{y}' for y in year_range]].sum()
+            pie_data.append({'Subnasional': s, 'Loss': total})
+
+    if pie_data:
+        df_pie = pd.DataFrame(pie_data)
+        fig_pie = px.pie(df_pie, names='Subnasional', values='Loss', hole=0.4,
+                         color='Subnasional', color_discrete_map=warna_negara)
+        fig_pie.update_traces(textinfo='percent+label')
+        fig_pie.update_layout(title_text=f"Komposisi Kehilangan Area Berpohon ({tahun_min}–{tahun_max})")
+
+    fig_bar = None
+    bar_data = []
+    for s in selected_sub_display:
+        df_s = primary_loss_df[primary_loss_df['sub_display'] == s]
+        if not df_s.empty:
+            values = df_s.iloc[0][[f'tc_loss_ha_{y}' for y in prim_range]].values
+            bar_data.append(pd.DataFrame({'Tahun': [str(y) for y in prim_range], 'Subnasional': s, 'Loss': values}))
+
+    if bar_data:
+        df_bar = pd.concat(bar_data)
+        fig_bar = px.bar(df_bar, x="Tahun", y="Loss", color="Subnasional", barmode="stack",
+                         labels={'Loss': 'Kehilangan (ha)'}, color_discrete_map=warna_negara)
+        fig_bar.update_layout(title_text=f"Perbandingan Kehilangan Hutan Primer ({tahun_min}–{tahun_max})")
+    return fig_pie, fig_bar
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_emission_charts(selected_countries, selected_sub_display, prim_range, tahun_min, tahun_max, warna_negara):
+    carbon_df = load_subnational_selection(SUBNATIONAL_CARBON_SHEET, selected_countries)
+
+    emission_cols_selected = [f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e'
+                              for y in range(tahun_min, tahun_max + 1)
+                              if f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e' in carbon_df.columns]
+
+    carbon_df['total_emission_selected'] = carbon_df[emission_cols_selected].sum(axis=1)
+
+    top_emission_selected = carbon_df[carbon_df['sub_display'].isin(selected_sub_display)]
+    fig_bar_total = px.bar(top_emission_selected, x='sub_display', y='total_emission_selected',
+                           labels={'sub_display': 'Subnasional', 'total_emission_selected': 'Total Emisi (Mg CO₂e)'},
+                           color='sub_display', color_discrete_map=warna_negara)
+    fig_bar_total.update_layout(yaxis=dict(rangemode="tozero"))
+
+    trend_data = []
+    insight_data = []
+
+    for s in selected_sub_display:
+        df_carbon_sub = carbon_df[carbon_df['sub_display'] == s]
+        if not df_carbon_sub.empty:
+            emission_cols = [f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e'
+                             for y in prim_range if f'gfw_forest_carbon_gross_emissions_{y}__Mg_CO2e' in df_carbon_sub.columns]
+            if emission_cols:
+                emissions = df_carbon_sub.iloc[0][emission_cols].values
+                years_emission = [int(col.split('_')[5]) for col in emission_cols]
+                trend_data.append(pd.DataFrame({'Tahun': [str(y) for y in years_emission], 'Subnasional': s, 'Emisi': emissions}))
+
+                max_idx = emissions.argmax()
+                min_idx = emissions.argmin()
+                insight_data.append(
+                    f"**{s}** — Tertinggi: {years_emission[max_idx]} ({emissions[max_idx]:,.0f} Mg), "
+                    f"Terendah: {years_emission[min_idx]} ({emissions[min_idx]:,.0f} Mg), "
+                    f"Rata-rata: {emissions.mean():,.0f} Mg")
+
+    fig_emission = None
+    if trend_data:
+        df_emission = pd.concat(trend_data)
+        fig_emission = px.line(df_emission, x="Tahun", y="Emisi", color="Subnasional", markers=True,
+                               labels={'Emisi': 'Emisi (Mg CO₂e)', 'Tahun': 'Tahun'},
+                               color_discrete_map=warna_negara)
+        fig_emission.update_layout(yaxis=dict(rangemode="tozero"))
+    return fig_bar_total, fig_emission, insight_data